@@ -4,11 +4,20 @@ from __future__ import annotations
 
 import argparse
 import json
+import logging
+import sys
 from pathlib import Path
-from typing import List, Sequence
+from typing import Any, Dict, List, Sequence
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speed-up for --format json
+    orjson = None
 
 from gpt_investing import AnalysisError, analyze_universe
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_UNIVERSE = [
     "AAPL",
     "MSFT",
@@ -60,17 +69,19 @@ DEFAULT_UNIVERSE = [
     "NKE",
     "AMD",
 ]
+_SORTED_DEFAULT_UNIVERSE = tuple(sorted(set(DEFAULT_UNIVERSE)))
+
+
+_COMMA_TO_NEWLINE = {ord(","): ord("\n")}
 
 
 def _load_tickers_from_file(path: Path) -> List[str]:
-    content = path.read_text(encoding="utf-8")
-    tickers: List[str] = []
-    for raw in content.replace(",", "\n").splitlines():
-        symbol = raw.strip().upper()
-        if not symbol or symbol.startswith("#"):
-            continue
-        tickers.append(symbol)
-    return tickers
+    content = path.read_text(encoding="utf-8").upper().translate(_COMMA_TO_NEWLINE)
+    return [
+        symbol
+        for symbol in (line.strip() for line in content.splitlines())
+        if symbol and not symbol.startswith("#")
+    ]
 
 
 def _parse_tickers(values: Sequence[str] | None, universe_file: Path | None) -> List[str]:
@@ -80,13 +91,19 @@ def _parse_tickers(values: Sequence[str] | None, universe_file: Path | None) ->
     if values:
         tickers.extend(symbol.upper() for symbol in values)
     if not tickers:
-        tickers = list(DEFAULT_UNIVERSE)
+        return list(_SORTED_DEFAULT_UNIVERSE)
     unique = sorted(set(tickers))
     if not unique:
         raise ValueError("No tickers supplied for analysis")
     return unique
 
 
+# One format call per table row; the optional metrics arrive pre-formatted.
+_format_row = " \t".join(
+    ("{:>4}", "{:>6}", "{:6.3f}", "{:6.3f}", "{:6.3f}", "{:6.3f}", "{}", "{}", "{}", "{}", "{}")
+).format
+
+
 def _format_percent(value: float | None) -> str:
     if value is None:
         return "   n/a"
@@ -99,11 +116,30 @@ def _format_ratio(value: float | None) -> str:
     return f"{value:6.2f}"
 
 
+def _describe_failure(reason: Exception) -> str:
+    return str(reason) or type(reason).__name__
+
+
+def _write_json(document: Dict[str, Any]) -> None:
+    if orjson is None:
+        print(json.dumps(document, indent=2))
+        return
+    options = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+    encoded = orjson.dumps(document, option=options)
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        # Text-only replacements such as contextlib.redirect_stdout(io.StringIO()).
+        sys.stdout.write(encoded.decode("utf-8"))
+        return
+    sys.stdout.flush()
+    buffer.write(encoded)
+
+
 def run_cli(args: argparse.Namespace) -> int:
     try:
         tickers = _parse_tickers(args.tickers, args.universe_file)
     except ValueError as exc:
-        print(f"Error: {exc}")
+        logger.error("Error: %s", exc)
         return 1
 
     try:
@@ -114,9 +150,11 @@ def run_cli(args: argparse.Namespace) -> int:
             momentum_weight=args.momentum_weight,
             risk_weight=args.risk_weight,
             top_n=args.top,
+            use_cache=not args.no_cache,
+            cache_ttl=args.cache_ttl,
         )
     except AnalysisError as exc:
-        print(f"Unable to evaluate tickers: {exc}")
+        logger.error("Unable to evaluate tickers: %s", exc)
         return 1
 
     if args.format == "json":
@@ -138,7 +176,8 @@ def run_cli(args: argparse.Namespace) -> int:
                     "market_cap": analysis.market_cap,
                 }
             )
-        print(json.dumps({"results": payload, "failures": summary.failures}, indent=2))
+        failures = {ticker: _describe_failure(reason) for ticker, reason in summary.failures.items()}
+        _write_json({"results": payload, "failures": failures})
     else:
         headers = (
             "Rank",
@@ -153,27 +192,30 @@ def run_cli(args: argparse.Namespace) -> int:
             "21d Mom",
             "21d Vol",
         )
-        print(" \t".join(headers))
+        lines = [" \t".join(headers)]
         for idx, ranked in enumerate(summary.ranked, start=1):
             analysis = ranked.analysis
-            row = (
-                f"{idx:>4}",
-                f"{ranked.ticker:>6}",
-                f"{ranked.composite_score:6.3f}",
-                f"{ranked.value_score:6.3f}",
-                f"{ranked.momentum_score:6.3f}",
-                f"{ranked.risk_score:6.3f}",
-                _format_ratio(analysis.pe_ratio),
-                _format_ratio(analysis.pb_ratio),
-                _format_percent(analysis.free_cash_flow_yield),
-                _format_percent(analysis.momentum_21d),
-                _format_percent(analysis.volatility_21d),
+            lines.append(
+                _format_row(
+                    idx,
+                    ranked.ticker,
+                    ranked.composite_score,
+                    ranked.value_score,
+                    ranked.momentum_score,
+                    ranked.risk_score,
+                    _format_ratio(analysis.pe_ratio),
+                    _format_ratio(analysis.pb_ratio),
+                    _format_percent(analysis.free_cash_flow_yield),
+                    _format_percent(analysis.momentum_21d),
+                    _format_percent(analysis.volatility_21d),
+                )
             )
-            print(" \t".join(row))
         if summary.failures:
-            print("\nTickers skipped due to data issues:")
-            for ticker, reason in summary.failures.items():
-                print(f"- {ticker}: {reason}")
+            lines.append("\nTickers skipped due to data issues:")
+            lines.extend(
+                f"- {ticker}: {_describe_failure(reason)}" for ticker, reason in summary.failures.items()
+            )
+        sys.stdout.write("\n".join(lines) + "\n")
 
     return 0
 
@@ -221,6 +263,16 @@ def build_parser() -> argparse.ArgumentParser:
         default=20,
         help="Number of top-ranked tickers to display (default: 20).",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always download fresh data instead of reusing cached Yahoo Finance data.",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=int,
+        help="Seconds before cached Yahoo Finance data expires (default: 3600, shorter for 1d/5d periods).",
+    )
     parser.add_argument(
         "--format",
         choices=("table", "json"),
@@ -233,6 +285,7 @@ def build_parser() -> argparse.ArgumentParser:
 def main(argv: Sequence[str] | None = None) -> int:
     parser = build_parser()
     args = parser.parse_args(argv)
+    logging.basicConfig(format="%(message)s")
     return run_cli(args)
 
 
@@ -3,6 +3,7 @@
 from .algorithm import (
     AnalysisError,
     AnalysisSummary,
+    FundamentalsError,
     RankedStock,
     StockAnalysis,
     analyze_universe,
@@ -14,4 +15,5 @@ __all__ = [
     "RankedStock",
     "StockAnalysis",
     "AnalysisError",
+    "FundamentalsError",
 ]
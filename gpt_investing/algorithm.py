@@ -2,24 +2,106 @@
 
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Iterable, List, Optional, Sequence
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple, Type, TypeVar
 
+import hashlib
+import json
+import logging
 import math
+import os
+import threading
+import time
 
+import numpy as np
+import pandas as pd
 import yfinance as yf
+from scipy.stats import rankdata
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
+from yfinance.exceptions import YFRateLimitError
+
+try:
+    from yahooquery import Ticker as YQTicker
+except ImportError:  # yahooquery is an optional batch backend for cash flow statements
+    YQTicker = None
+
+
+logger = logging.getLogger(__name__)
 
 LOOKBACK_DAYS = 21
 ANNUALIZATION_FACTOR = math.sqrt(252)
+_ANNUALIZATION_FACTOR_F32 = np.float32(ANNUALIZATION_FACTOR)
+MAX_WORKERS = 16
+# Yahoo Finance throttles aggressive clients, so fundamentals lookups are paced.
+RATE_LIMIT_CALLS = 60
+RATE_LIMIT_PERIOD = 60.0
+MAX_FETCH_ATTEMPTS = 4
+RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = (YFRateLimitError,)
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "gpt_investing"
+DEFAULT_CACHE_TTL = 3600
+# Short lookbacks are dominated by the current session's bars, so refresh them sooner.
+PERIOD_CACHE_TTL = {"1d": 300, "5d": 900}
+# Ticker.info fields feeding the valuation metrics; fast_info has no P/E or P/B.
+INFO_KEYS = {
+    "pe_ratio": "trailingPE",
+    "pb_ratio": "priceToBook",
+    "market_cap": "marketCap",
+}
+
+T = TypeVar("T")
+Fundamentals = Tuple[Optional[float], Optional[float], Optional[float], Optional[float]]
 
 
 class AnalysisError(RuntimeError):
     """Raised when the analysis pipeline cannot be executed for a ticker."""
 
 
-@dataclass
+class FundamentalsError(AnalysisError):
+    """Recorded when a ticker's fundamentals could not be fetched.
+
+    The underlying error is kept as ``__cause__`` and only formatted on demand.
+    """
+
+    def __init__(self, cause: BaseException) -> None:
+        super().__init__(cause)
+        self.__cause__ = cause
+
+    def __str__(self) -> str:
+        cause = self.__cause__
+        return f"Failed to fetch fundamentals: {str(cause) or type(cause).__name__}"
+
+
+class _RateLimiter:
+    """Thread-safe sliding-window limiter allowing ``calls`` per ``period`` seconds."""
+
+    def __init__(self, calls: int, period: float) -> None:
+        self._calls = calls
+        self._period = period
+        self._timestamps: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._timestamps and now - self._timestamps[0] >= self._period:
+                    self._timestamps.popleft()
+                if len(self._timestamps) < self._calls:
+                    self._timestamps.append(now)
+                    return
+                delay = self._period - (now - self._timestamps[0])
+            time.sleep(delay)
+
+
+_FUNDAMENTALS_LIMITER = _RateLimiter(RATE_LIMIT_CALLS, RATE_LIMIT_PERIOD)
+
+
+@dataclass(slots=True)
 class StockAnalysis:
     """Container for the raw metrics computed for a ticker."""
 
@@ -33,7 +115,7 @@ class StockAnalysis:
     last_updated: datetime = field(default_factory=datetime.utcnow)
 
 
-@dataclass
+@dataclass(slots=True)
 class RankedStock:
     """Represents the scoring output for a ticker."""
 
@@ -50,82 +132,261 @@ class AnalysisSummary:
     """Container for the ranked output and any tickers that failed analysis."""
 
     ranked: List[RankedStock]
-    failures: Dict[str, str]
+    failures: Dict[str, Exception]
+
 
+def _compute_momentum(close_prices: np.ndarray) -> np.ndarray:
+    """Return the trailing momentum for every column of a ``(T, N)`` close matrix."""
 
-def _compute_momentum(close_prices: Sequence[float]) -> float:
-    if len(close_prices) <= LOOKBACK_DAYS:
-        raise AnalysisError("Not enough price history to compute momentum")
     return close_prices[-1] / close_prices[-(LOOKBACK_DAYS + 1)] - 1
 
 
-def _compute_volatility(returns: Sequence[float]) -> float:
-    if len(returns) < LOOKBACK_DAYS:
-        raise AnalysisError("Not enough return history to compute volatility")
-    mean = sum(returns[-LOOKBACK_DAYS:]) / LOOKBACK_DAYS
-    variance = sum((r - mean) ** 2 for r in returns[-LOOKBACK_DAYS:]) / LOOKBACK_DAYS
-    return math.sqrt(variance) * ANNUALIZATION_FACTOR
-
-
-def _normalize(metric: Dict[str, Optional[float]], higher_is_better: bool) -> Dict[str, float]:
-    valid = {ticker: value for ticker, value in metric.items() if value is not None and math.isfinite(value)}
-    if not valid:
-        return {ticker: 0.0 for ticker in metric}
-    min_value = min(valid.values())
-    max_value = max(valid.values())
-    if math.isclose(min_value, max_value):
-        base_score = 1.0
-        return {ticker: (base_score if ticker in valid else 0.0) for ticker in metric}
-    scale = max_value - min_value
-    normalized = {}
-    for ticker, value in metric.items():
-        if ticker not in valid:
-            normalized[ticker] = 0.0
-            continue
-        score = (value - min_value) / scale
-        if not higher_is_better:
-            score = 1.0 - score
-        normalized[ticker] = score
-    return normalized
-
-
-def _fetch_analysis(ticker: str, period: str = "6mo") -> StockAnalysis:
+def _compute_volatility(returns: np.ndarray) -> np.ndarray:
+    """Return the annualised volatility for every column of a ``(T, N)`` return matrix."""
+
+    return returns[-LOOKBACK_DAYS:].std(axis=0, dtype=np.float32) * _ANNUALIZATION_FACTOR_F32
+
+
+def _normalize(metric: np.ndarray, higher_is_better: bool) -> np.ndarray:
+    """Map a metric onto ``[0, 1]`` by cross-sectional rank.
+
+    Ranks keep a single extreme value from compressing every other ticker
+    towards one end of the scale. Missing or non-finite values score 0.
+    """
+
+    values = np.array(metric, dtype=float)
+    invalid = ~np.isfinite(values)
+    if invalid.all():
+        return np.zeros_like(values)
+    values[invalid] = np.nan
+    if math.isclose(np.nanmin(values), np.nanmax(values)):
+        return np.where(invalid, 0.0, 1.0)
+    ranks = rankdata(values, method="average", nan_policy="omit")
+    score = (ranks - 1) / (np.count_nonzero(~invalid) - 1)
+    if not higher_is_better:
+        score = 1.0 - score
+    return np.where(invalid, 0.0, score)
+
+
+def _cache_path(suffix: str, *key: str) -> Path:
+    digest = hashlib.sha256("\0".join(key).encode("utf-8")).hexdigest()
+    return CACHE_DIR / f"{digest}{suffix}"
+
+
+def _cache_load(path: Path, ttl: float, read: Callable[[Path], T]) -> Optional[T]:
+    """Return ``read(path)``, or ``None`` if the entry is missing, stale, or unreadable."""
+
+    try:
+        if time.time() - path.stat().st_mtime > ttl:
+            return None
+        return read(path)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:  # noqa: BLE001 - an unreadable entry is just a cache miss
+        logger.debug("Ignoring unreadable cache entry %s: %s", path, exc)
+        return None
+
+
+def _cache_store(path: Path, write: Callable[[Path], None]) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(".tmp")
+        write(partial)
+        partial.replace(path)
+    except OSError as exc:
+        logger.debug("Could not write cache entry %s: %s", path, exc)
+
+
+def _read_prices(path: Path) -> pd.DataFrame:
+    return pd.read_csv(path, index_col=0, parse_dates=True, dtype=float)
+
+
+def _read_fundamentals(path: Path) -> Fundamentals:
+    values = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(values, list) or len(values) != 4:
+        raise ValueError("expected a list of four values")
+    pe_ratio, pb_ratio, market_cap, free_cash_flow = (None if value is None else float(value) for value in values)
+    return pe_ratio, pb_ratio, market_cap, free_cash_flow
+
+
+def _write_fundamentals(values: Fundamentals) -> Callable[[Path], None]:
+    document = json.dumps([None if value is None else float(value) for value in values])
+    return lambda path: path.write_text(document, encoding="utf-8")
+
+
+def _fetch_prices_bulk(tickers: Sequence[str], period: str = "6mo") -> pd.DataFrame:
+    """Download daily closes for every ticker in a single multi-symbol request.
+
+    Returns a frame indexed by date with one column of close prices per ticker.
+    Tickers that Yahoo Finance returned no data for are present as all-NaN columns.
+    """
+
+    history = yf.download(
+        list(tickers),
+        period=period,
+        interval="1d",
+        group_by="ticker",
+        threads=True,
+        progress=False,
+        auto_adjust=True,
+    )
+    if history is None or history.empty:
+        return pd.DataFrame(columns=list(tickers), dtype=float)
+    if isinstance(history.columns, pd.MultiIndex):
+        closes = history.xs("Close", axis=1, level=1)
+    else:
+        # Older yfinance releases return flat columns for a single symbol.
+        closes = history[["Close"]].set_axis(list(tickers)[:1], axis=1)
+    return closes.reindex(columns=list(tickers))
+
+
+def _fetch_prices(tickers: Sequence[str], period: str, cache_ttl: Optional[int]) -> pd.DataFrame:
+    """Return the close-price frame for ``tickers``, reusing a fresh on-disk copy if any."""
+
+    if cache_ttl is None:
+        return _fetch_prices_bulk(tickers, period=period)
+    path = _cache_path(".csv", "prices", period, *sorted(tickers))
+    closes = _cache_load(path, cache_ttl, _read_prices)
+    if closes is not None:
+        return closes.reindex(columns=list(tickers))
+    closes = _fetch_prices_bulk(tickers, period=period)
+    # An empty download is usually a transient failure and should not stick.
+    if closes.notna().any().any():
+        _cache_store(path, closes.to_csv)
+    return closes
+
+
+def _compute_price_metrics(closes: pd.DataFrame, failures: Dict[str, Exception]) -> pd.DataFrame:
+    """Compute momentum and volatility for the whole universe at once.
+
+    Tickers without enough history are recorded in ``failures`` and left out of
+    the returned frame, which is indexed by ticker.
+    """
+
+    counts = closes.count()
+    for ticker, count in counts[counts <= LOOKBACK_DAYS].items():
+        if count == 0:
+            failures[ticker] = AnalysisError("No price history available")
+        else:
+            failures[ticker] = AnalysisError("Not enough price history to compute momentum")
+        logger.debug("Skipping %s: %s", ticker, failures[ticker])
+    eligible = counts.index[counts > LOOKBACK_DAYS]
+    if eligible.empty:
+        return pd.DataFrame(columns=["momentum_21d", "volatility_21d"], dtype=float)
+    # Each ticker's own last LOOKBACK_DAYS + 1 observations, so a missing bar is
+    # skipped rather than filled with a stale price. Single precision is ample
+    # for price ratios and halves the memory traffic of the reductions over
+    # large universes; scores are computed in float64.
+    window = np.column_stack(
+        [closes[ticker].dropna().to_numpy(dtype=np.float32)[-(LOOKBACK_DAYS + 1):] for ticker in eligible]
+    )
+    returns = np.diff(window, axis=0) / window[:-1]
+    return pd.DataFrame(
+        {
+            "momentum_21d": _compute_momentum(window),
+            "volatility_21d": _compute_volatility(returns),
+        },
+        index=eligible,
+    )
+
+
+def _read_info(ticker_data: yf.Ticker) -> Dict[str, Optional[float]]:
+    """Return the valuation fields used by the screener from ``Ticker.info``.
+
+    ``info`` is fetched once as a plain dict. Yahoo reports some ratios as
+    strings such as ``"Infinity"``, and zero as a placeholder; both are treated
+    as missing.
+    """
+
+    info = ticker_data.info or {}
+    values: Dict[str, Optional[float]] = {}
+    for name, key in INFO_KEYS.items():
+        value = info.get(key)
+        values[name] = float(value) if isinstance(value, (int, float)) and value else None
+    return values
+
+
+def _fetch_free_cash_flows_bulk(tickers: Sequence[str]) -> Dict[str, float]:
+    """Fetch the latest annual free cash flow for every ticker in one yahooquery batch.
+
+    Returns an empty mapping when yahooquery is not installed. A missing value
+    for the latest year is returned as NaN. Tickers absent from the result are
+    left for the per-ticker yfinance lookup.
+    """
+
+    if YQTicker is None or not tickers:
+        return {}
+    statements = YQTicker(list(tickers), asynchronous=True).cash_flow(frequency="a", trailing=False)
+    # yahooquery reports request errors as a dict or string instead of a frame.
+    if not isinstance(statements, pd.DataFrame) or "FreeCashFlow" not in statements.columns:
+        return {}
+    # Like the yfinance path, use the most recent fiscal year even when its value
+    # is missing rather than silently scoring an older year.
+    latest = statements.sort_values("asOfDate", kind="stable").groupby(level=0).tail(1)["FreeCashFlow"]
+    return {ticker: float(value) for ticker, value in latest.items()}
+
+
+@retry(
+    retry=retry_if_exception_type(RETRYABLE_ERRORS),
+    stop=stop_after_attempt(MAX_FETCH_ATTEMPTS),
+    wait=wait_exponential(multiplier=1, min=1, max=30),
+    reraise=True,
+)
+def _fetch_fundamentals(
+    ticker: str,
+    free_cash_flow: Optional[float] = None,
+) -> Fundamentals:
+    """Return ``(pe_ratio, pb_ratio, market_cap, free_cash_flow)`` for ``ticker``.
+
+    Calls are paced by the module rate limiter and retried with exponential
+    backoff when Yahoo Finance reports that the client is being throttled. When
+    ``free_cash_flow`` is already known the cash flow statement is not fetched.
+    """
+
+    _FUNDAMENTALS_LIMITER.acquire()
     ticker_data = yf.Ticker(ticker)
-    history = ticker_data.history(period=period, interval="1d")
-    if history.empty:
-        raise AnalysisError("No price history available")
-    close = history["Close"].tolist()
-    momentum = _compute_momentum(close)
-    returns = history["Close"].pct_change().dropna().tolist()
-    volatility = _compute_volatility(returns)
-
-    info = ticker_data.fast_info
-    pe_ratio = info.get("pe_ratio") or info.get("trailing_pe")
-    pb_ratio = info.get("pb_ratio") or info.get("price_to_book")
-    market_cap = info.get("market_cap")
+    info = _read_info(ticker_data)
+    pe_ratio = info["pe_ratio"]
+    pb_ratio = info["pb_ratio"]
+    market_cap = info["market_cap"]
+
+    if free_cash_flow is not None:
+        return pe_ratio, pb_ratio, market_cap, free_cash_flow
 
     cash_flow = ticker_data.cashflow
-    free_cash_flow = None
-    free_cash_flow_yield = None
     if cash_flow is not None and not cash_flow.empty:
-        if "Free Cash Flow" in cash_flow.index:
-            free_cash_flow = float(cash_flow.loc["Free Cash Flow"].iloc[0])
-        elif "FreeCashFlow" in cash_flow.index:
-            free_cash_flow = float(cash_flow.loc["FreeCashFlow"].iloc[0])
-    if free_cash_flow is not None and market_cap:
-        free_cash_flow_yield = free_cash_flow / market_cap
+        for label in ("Free Cash Flow", "FreeCashFlow"):
+            try:
+                row = cash_flow.index.get_loc(label)
+            except KeyError:
+                continue
+            free_cash_flow = float(cash_flow.iat[row, 0])
+            break
+    return pe_ratio, pb_ratio, market_cap, free_cash_flow
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if pd.isna(value) else float(value)
+
 
+def _to_analysis(ticker: str, row: pd.Series, now: datetime) -> StockAnalysis:
     return StockAnalysis(
         ticker=ticker,
-        momentum_21d=momentum,
-        volatility_21d=volatility,
-        pe_ratio=pe_ratio,
-        pb_ratio=pb_ratio,
-        free_cash_flow_yield=free_cash_flow_yield,
-        market_cap=market_cap,
+        momentum_21d=_optional(row["momentum_21d"]),
+        volatility_21d=_optional(row["volatility_21d"]),
+        pe_ratio=_optional(row["pe_ratio"]),
+        pb_ratio=_optional(row["pb_ratio"]),
+        free_cash_flow_yield=_optional(row["free_cash_flow_yield"]),
+        market_cap=_optional(row["market_cap"]),
+        last_updated=now,
     )
 
 
+def _no_results_error(failures: Dict[str, Exception]) -> AnalysisError:
+    joined = ", ".join(f"{ticker} ({reason})" for ticker, reason in failures.items())
+    return AnalysisError(f"Unable to analyze any tickers. Reasons: {joined}")
+
+
 def analyze_universe(
     tickers: Iterable[str],
     *,
@@ -134,76 +395,117 @@ def analyze_universe(
     momentum_weight: float = 0.3,
     risk_weight: float = 0.2,
     top_n: Optional[int] = 20,
+    use_cache: bool = False,
+    cache_ttl: Optional[int] = None,
 ) -> AnalysisSummary:
     """Analyze and score a collection of tickers.
 
     Args:
-        tickers: Iterable of ticker symbols to evaluate.
+        tickers: Iterable of ticker symbols to evaluate (case-insensitive).
         period: Price history period to request from Yahoo Finance.
         value_weight: Weight applied to the undervaluation score.
         momentum_weight: Weight applied to the momentum score.
         risk_weight: Weight applied to the risk (low volatility) score.
         top_n: If provided, limits the number of tickers returned.
+        use_cache: Whether to reuse price history and fundamentals cached under
+            :data:`CACHE_DIR` (a per-user cache directory).
+        cache_ttl: Seconds before cached data expires. Defaults to a
+            period-dependent value so short intraday lookbacks refresh sooner.
 
     Returns:
         An :class:`AnalysisSummary` with the ranked results and any tickers that
         could not be analysed.
     """
 
-    analyses: Dict[str, StockAnalysis] = {}
-    failures: Dict[str, str] = {}
-    for ticker in tickers:
+    now = datetime.utcnow()
+    # yfinance upper-cases symbols internally, so results are keyed that way too.
+    symbols = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+    failures: Dict[str, Exception] = {}
+    if not use_cache:
+        cache_ttl = None
+    elif cache_ttl is None:
+        cache_ttl = PERIOD_CACHE_TTL.get(period, DEFAULT_CACHE_TTL)
+    closes = _fetch_prices(symbols, period, cache_ttl) if symbols else pd.DataFrame()
+    metrics = _compute_price_metrics(closes, failures)
+    if metrics.empty:
+        raise _no_results_error(failures)
+
+    fundamentals: Dict[str, Fundamentals] = {}
+    if cache_ttl is not None:
+        for ticker in metrics.index:
+            cached = _cache_load(_cache_path(".json", "fundamentals", ticker), cache_ttl, _read_fundamentals)
+            if cached is not None:
+                fundamentals[ticker] = cached
+    pending = [ticker for ticker in metrics.index if ticker not in fundamentals]
+
+    try:
+        free_cash_flows = _fetch_free_cash_flows_bulk(pending)
+    except Exception as exc:  # noqa: BLE001 - the per-ticker yfinance statements are the fallback
+        logger.warning("Batch cash flow download failed, falling back to yfinance: %s", exc)
+        free_cash_flows = {}
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            ticker: executor.submit(_fetch_fundamentals, ticker, free_cash_flows.get(ticker))
+            for ticker in pending
+        }
+    for ticker, future in futures.items():
         try:
-            analyses[ticker] = _fetch_analysis(ticker, period=period)
-        except AnalysisError as exc:
-            failures[ticker] = str(exc)
-        except Exception as exc:  # noqa: BLE001 - propagate unexpected errors with context
-            raise AnalysisError(f"Failed to analyze {ticker}: {exc}") from exc
-
-    if not analyses:
-        joined = ", ".join(f"{ticker} ({reason})" for ticker, reason in failures.items())
-        raise AnalysisError(f"Unable to analyze any tickers. Reasons: {joined}")
-
-    pe_ratios = {ticker: analysis.pe_ratio for ticker, analysis in analyses.items()}
-    pb_ratios = {ticker: analysis.pb_ratio for ticker, analysis in analyses.items()}
-    fcf_yields = {ticker: analysis.free_cash_flow_yield for ticker, analysis in analyses.items()}
-    momenta = {ticker: analysis.momentum_21d for ticker, analysis in analyses.items()}
-    volatilities = {ticker: analysis.volatility_21d for ticker, analysis in analyses.items()}
-
-    pe_scores = _normalize(pe_ratios, higher_is_better=False)
-    pb_scores = _normalize(pb_ratios, higher_is_better=False)
-    fcf_scores = _normalize(fcf_yields, higher_is_better=True)
-    momentum_scores = _normalize(momenta, higher_is_better=True)
-    risk_scores = _normalize(volatilities, higher_is_better=False)
-
-    ranked: List[RankedStock] = []
-    for ticker, analysis in analyses.items():
-        value_components: List[float] = []
-        if analyses[ticker].pe_ratio is not None:
-            value_components.append(pe_scores[ticker])
-        if analyses[ticker].pb_ratio is not None:
-            value_components.append(pb_scores[ticker])
-        if analyses[ticker].free_cash_flow_yield is not None:
-            value_components.append(fcf_scores[ticker])
-
-        value_score = sum(value_components) / len(value_components) if value_components else 0.0
-        composite = (
-            value_weight * value_score
-            + momentum_weight * momentum_scores[ticker]
-            + risk_weight * risk_scores[ticker]
-        )
-        ranked.append(
-            RankedStock(
-                ticker=ticker,
-                composite_score=composite,
-                value_score=value_score,
-                momentum_score=momentum_scores[ticker],
-                risk_score=risk_scores[ticker],
-                analysis=analysis,
-            )
-        )
+            fundamentals[ticker] = future.result()
+            if cache_ttl is not None:
+                _cache_store(_cache_path(".json", "fundamentals", ticker), _write_fundamentals(fundamentals[ticker]))
+        except Exception as exc:  # noqa: BLE001 - a single bad ticker should not abort the universe
+            failures[ticker] = FundamentalsError(exc)
+            logger.debug("Skipping %s: %s", ticker, failures[ticker])
+
+    if not fundamentals:
+        raise _no_results_error(failures)
+
+    metrics = metrics.join(
+        pd.DataFrame.from_dict(
+            fundamentals,
+            orient="index",
+            columns=["pe_ratio", "pb_ratio", "market_cap", "free_cash_flow"],
+            dtype=float,
+        ),
+        how="inner",
+    )
+    market_cap = metrics["market_cap"]
+    metrics["free_cash_flow_yield"] = metrics.pop("free_cash_flow") / market_cap.where(market_cap != 0)
+
+    value_columns = {"pe_ratio": False, "pb_ratio": False, "free_cash_flow_yield": True}
+    value_scores = pd.DataFrame(
+        {
+            column: _normalize(metrics[column].to_numpy(), higher_is_better)
+            for column, higher_is_better in value_columns.items()
+        },
+        index=metrics.index,
+    )
+    scores = pd.DataFrame(index=metrics.index)
+    # Only average the valuation metrics a ticker actually reported.
+    scores["value"] = value_scores.where(metrics[list(value_columns)].notna()).mean(axis=1).fillna(0.0)
+    scores["momentum"] = _normalize(metrics["momentum_21d"].to_numpy(), higher_is_better=True)
+    scores["risk"] = _normalize(metrics["volatility_21d"].to_numpy(), higher_is_better=False)
+    scores["composite"] = (
+        value_weight * scores["value"]
+        + momentum_weight * scores["momentum"]
+        + risk_weight * scores["risk"]
+    )
 
-    ranked.sort(key=lambda item: item.composite_score, reverse=True)
     if top_n is not None:
-        ranked = ranked[:top_n]
+        # Partial selection: O(N log top_n) rather than sorting the whole universe.
+        scores = scores.nlargest(top_n, "composite", keep="first")
+    else:
+        scores = scores.sort_values("composite", ascending=False, kind="stable")
+    ranked = [
+        RankedStock(
+            ticker=ticker,
+            composite_score=float(row.composite),
+            value_score=float(row.value),
+            momentum_score=float(row.momentum),
+            risk_score=float(row.risk),
+            analysis=_to_analysis(ticker, metrics.loc[ticker], now),
+        )
+        for ticker, row in zip(scores.index, scores.itertuples(index=False))
+    ]
     return AnalysisSummary(ranked=ranked, failures=failures)